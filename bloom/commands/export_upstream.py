@@ -36,6 +36,7 @@ import argparse
 import binascii
 import hashlib
 import os
+import shutil
 import sys
 import traceback
 
@@ -54,16 +55,10 @@ from bloom.git import get_root
 from bloom.git import tag_exists
 
 from bloom.util import add_global_arguments
-from bloom.util import change_directory
+from bloom.util import create_temporary_directory
+from bloom.util import execute_command
 from bloom.util import handle_global_arguments
-from bloom.util import temporary_directory
-
-try:
-    from vcstools.vcs_abstraction import get_vcs_client
-except ImportError:
-    debug(traceback.format_exc())
-    error("vcstools was not detected, please install it.", file=sys.stderr,
-          exit=True)
+from bloom.util import remove_directory_in_background
 
 
 def get_argument_parser():
@@ -100,15 +95,24 @@ def calculate_file_md5(path, block_size=2 ** 20):
 
 def export_upstream(uri, tag, vcs_type, output_dir, show_uri, name):
     tag = tag if tag != ':{none}' else None
-    output_dir = output_dir or os.getcwd()
+    # The working directory is never changed, but the vcs client may run
+    # the export from within the checkout, so make the output absolute
+    output_dir = os.path.abspath(output_dir or os.getcwd())
     if uri.startswith('git@'):
         uri_is_path = False
     else:
         uri_parsed = urlparse(uri)
-        uri = uri if uri_parsed.scheme else uri_parsed.path
+        uri = uri if uri_parsed.scheme else os.path.abspath(uri_parsed.path)
         uri_is_path = False if uri_parsed.scheme else True
     name = name or 'upstream'
-    with temporary_directory() as tmp_dir:
+    try:
+        from vcstools.vcs_abstraction import get_vcs_client
+    except ImportError:
+        debug(traceback.format_exc())
+        error("vcstools was not detected, please install it.", file=sys.stderr,
+              exit=True)
+    tmp_dir = create_temporary_directory()
+    try:
         info("Checking out repository at '{0}'".format(show_uri or uri) +
              (" to reference '{0}'.".format(tag) if tag else '.'))
         if uri_is_path:
@@ -116,7 +120,18 @@ def export_upstream(uri, tag, vcs_type, output_dir, show_uri, name):
         else:
             repo_path = os.path.join(tmp_dir, 'upstream')
             upstream_repo = get_vcs_client(vcs_type, repo_path)
-            if not upstream_repo.checkout(uri, tag or ''):
+            # Only the tree at the reference is exported, so try to avoid
+            # fetching the whole history with a shallow clone first
+            shallow = False
+            if vcs_type == 'git':
+                cmd = ['git', 'clone', '--depth', '1', '--single-branch']
+                cmd += (['--branch', tag] if tag else []) + [uri, repo_path]
+                shallow = execute_command(cmd, shell=False, autofail=False, silent_error=True) == 0
+                if not shallow:
+                    debug("Shallow clone failed, falling back to a full clone.")
+                    if os.path.exists(repo_path):
+                        shutil.rmtree(repo_path)
+            if not shallow and not upstream_repo.checkout(uri, tag or ''):
                 error("Failed to clone repository at '{0}'".format(uri) +
                       (" to reference '{0}'.".format(tag) if tag else '.'),
                       exit=True)
@@ -128,16 +143,18 @@ def export_upstream(uri, tag, vcs_type, output_dir, show_uri, name):
             error("Failed to create archive of upstream repository at '{0}'"
                   .format(show_uri))
             if tag and vcs_type == 'git':  # can only check for git repos
-                with change_directory(upstream_repo.get_path()):
-                    if not tag_exists(tag):
-                        warning("'{0}' is not a tag in the upstream repository..."
-                                .format(tag))
-                    if not branch_exists(tag):
-                        warning("'{0}' is not a branch in the upstream repository..."
-                                .format(tag))
+                repo_dir = upstream_repo.get_path()
+                if not tag_exists(tag, directory=repo_dir):
+                    warning("'{0}' is not a tag in the upstream repository..."
+                            .format(tag))
+                if not branch_exists(tag, directory=repo_dir):
+                    warning("'{0}' is not a branch in the upstream repository..."
+                            .format(tag))
         if not os.path.exists(full_tarball_path):
             error("Tarball was not created.", exit=True)
         info("md5: {0}".format(calculate_file_md5(full_tarball_path)))
+    finally:
+        remove_directory_in_background(tmp_dir)
 
 
 def main(sysargs=None):
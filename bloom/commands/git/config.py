@@ -35,9 +35,22 @@ from __future__ import print_function
 import argparse
 import copy
 import yaml
-import subprocess
 import sys
 
+# Python 2/3 support.
+try:
+    from configparser import NoOptionError
+    from configparser import RawConfigParser
+except ImportError:
+    from ConfigParser import NoOptionError
+    from ConfigParser import RawConfigParser
+try:
+    # Python2
+    from StringIO import StringIO
+except ImportError:
+    # Python3
+    from io import StringIO
+
 from bloom.config import ACTION_LIST_HISTORY
 from bloom.config import BLOOM_CONFIG_BRANCH
 from bloom.config import config_template
@@ -61,7 +74,6 @@ from bloom.logging import warning
 
 from bloom.util import add_global_arguments
 from bloom.util import execute_command
-from bloom.util import check_output
 from bloom.util import handle_global_arguments
 from bloom.util import maybe_continue
 from bloom.util import safe_input
@@ -79,6 +91,48 @@ template_entry_order = [
 ]
 
 
+def parse_bloom_conf(data):
+    """
+    Returns the upstream settings stored in an old style bloom.conf file.
+
+    The contents are parsed in process rather than querying each key with
+    ``git config -f bloom.conf``. Only what git writes for these simple
+    settings is understood: the section name is matched case-insensitively
+    and surrounding double quotes are removed from the values, repeated keys
+    take the last value like ``git config --get``, but git's escape
+    sequences (e.g. ``\\"`` or ``\\\\``) are not undone.
+
+    :param data: contents of the bloom.conf file
+    :returns: tuple of (upstream repository, upstream type, upstream branch),
+        the upstream branch is '' if it is not set
+    :raises: ConfigParser.Error if the upstream settings are missing
+    """
+    def get_value(option):
+        return bloom_conf.get(section, option).strip().strip('"')
+    # git config indents keys with a tab, which Python 2's parser rejects
+    data = '\n'.join(line.strip() for line in data.splitlines())
+    try:
+        # Keep the last of repeated keys rather than failing, like git
+        bloom_conf = RawConfigParser(strict=False)
+    except TypeError:
+        # Python 2, which is never strict
+        bloom_conf = RawConfigParser()
+    if hasattr(bloom_conf, 'read_string'):
+        bloom_conf.read_string(data)
+    else:
+        bloom_conf.readfp(StringIO(data))
+    # git section names are case insensitive
+    sections = [x for x in bloom_conf.sections() if x.lower() == 'bloom']
+    section = sections[0] if sections else 'bloom'
+    upstream_repo = get_value('upstream')
+    upstream_type = get_value('upstreamtype')
+    try:
+        upstream_branch = get_value('upstreambranch')
+    except NoOptionError:
+        upstream_branch = ''
+    return upstream_repo, upstream_type, upstream_branch
+
+
 @inbranch('bloom')
 def convert_old_bloom_conf(prefix=None):
     prefix = prefix if prefix is not None else 'convert'
@@ -89,15 +143,9 @@ def convert_old_bloom_conf(prefix=None):
         track_count += 1
         track = prefix + str(track_count)
     track_dict = copy.copy(DEFAULT_TEMPLATE)
-    cmd = 'git config -f bloom.conf bloom.upstream'
-    upstream_repo = check_output(cmd, shell=True).strip()
-    cmd = 'git config -f bloom.conf bloom.upstreamtype'
-    upstream_type = check_output(cmd, shell=True).strip()
-    try:
-        cmd = 'git config -f bloom.conf bloom.upstreambranch'
-        upstream_branch = check_output(cmd, shell=True).strip()
-    except subprocess.CalledProcessError:
-        upstream_branch = ''
+    with open('bloom.conf', 'r') as f:
+        bloom_conf = f.read()
+    upstream_repo, upstream_type, upstream_branch = parse_bloom_conf(bloom_conf)
     for key in template_entry_order:
         if key == 'vcs_uri':
             track_dict[key] = upstream_repo
@@ -110,8 +158,7 @@ def convert_old_bloom_conf(prefix=None):
             continue
         track_dict[key] = track_dict[key].default
     debug('Converted bloom.conf:')
-    with open('bloom.conf', 'r') as f:
-        debug(f.read())
+    debug(bloom_conf)
     debug('To this track:')
     debug(str({track: track_dict}))
     tracks_dict['tracks'][track] = track_dict
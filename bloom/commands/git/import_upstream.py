@@ -38,7 +38,9 @@ import shutil
 import sys
 import tarfile
 import tempfile
+import zlib
 
+from packaging.version import InvalidVersion
 from packaging.version import parse as parse_version
 
 try:
@@ -56,6 +58,7 @@ from bloom.git import delete_tag
 from bloom.git import ensure_clean_working_env
 from bloom.git import ensure_git_root
 from bloom.git import get_last_tag_by_version
+from bloom.git import get_root
 from bloom.git import GitClone
 from bloom.git import has_changes
 from bloom.git import inbranch
@@ -86,79 +89,99 @@ def version_check(version):
     last_tag_version = last_tag.split('/')[-1]
     info(fmt("The latest upstream tag in the release repository is '@!{0}@|'."
          .format(last_tag.replace('@', '@@'))))
-    # Ensure the new version is greater than the last tag
-    if parse_version(version) < parse_version(last_tag_version):
-        warning("""\
+    # Ensure the new version is not older than the last tag, the same
+    # version is handled by the existing tag checks (see --replace)
+    try:
+        if parse_version(version) >= parse_version(last_tag_version):
+            return
+    except InvalidVersion:
+        warning("Cannot compare the upstream version '{0}' with upstream version '{1}', "
+                "skipping the version check.".format(version, last_tag_version))
+        return
+    warning("""\
 Version discrepancy:
 The upstream version '{0}' isn't newer than upstream version '{1}'.
 """.format(version, last_tag_version))
 
 
+def extract_tarball(tarball_path, extract_dir):
+    """
+    Extracts a .tar.gz archive into the given directory in a single pass.
+
+    Version control metadata is skipped and a single top level folder named
+    after the archive (mostly from hg) is unnested.
+    Any failure to read the archive, e.g. a truncated download, is an error.
+    """
+    ignores = ('.git', '.gitignore', '.svn', '.hgignore', '.hg', 'CVS')
+    try:
+        # Read the archive as a stream, so it is only decompressed once
+        with tarfile.open(tarball_path, 'r|gz') as targz:
+            members = (m for m in targz if m.name.split('/')[-1] not in ignores)
+            targz.extractall(extract_dir, members)
+    except (tarfile.TarError, EOFError, IOError, OSError, zlib.error) as exc:
+        error("Failed to extract archive '{0}': {1}".format(tarball_path, exc),
+              exit=True)
+
+    # Check for folder nesting (mostly hg)
+    items = [i for i in os.listdir(extract_dir) if not i.startswith('.')]
+    tarball_prefix = os.path.basename(tarball_path)[:-len('.tag.gz')]
+    if [tarball_prefix] == items:
+        debug('Removing nested tarball folder: ' + str(tarball_prefix))
+        tarball_prefix_path = os.path.join(extract_dir, tarball_prefix)
+        for item in os.listdir(tarball_prefix_path):
+            item_path = os.path.join(tarball_prefix_path, item)
+            debug('moving ' + str(item_path) + ' to ' + str(os.path.join(extract_dir, item)))
+            shutil.move(item_path, os.path.join(extract_dir, item))
+        shutil.rmtree(tarball_prefix_path)
+    else:
+        debug('No nested tarball folder found.')
+
+
 def import_tarball(tarball_path, target_branch, version, name):
     if tarball_path.endswith('.zip'):
         error("Zip archives are not yet supported.", exit=True)
-    # Create the tarfile handle
-    targz = tarfile.open(tarball_path, 'r:gz')
-    with inbranch(target_branch):
-        # Prepare list of members to extract, ignoring some
-        ignores = ('.git', '.gitignore', '.svn', '.hgignore', '.hg', 'CVS')
-        members = targz.getmembers()
-        members = [m for m in members if m.name.split('/')[-1] not in ignores]
-
-        # Clear out the local branch
-        items = []
-        for item in os.listdir(os.getcwd()):
-            if item in ['.git', '..', '.']:
-                continue
-            items.append(item)
-        if len(items) > 0:
-            execute_command('git rm -rf ' + ' '.join(['"%s"' % i for i in items if i]))
-        # Clear out any untracked files
-        execute_command('git clean -fdx')
-
-        # Extract the tarball into the clean branch
-        targz.extractall(os.getcwd(), members)
-
-        # Check for folder nesting (mostly hg)
-        items = []
-        for item in os.listdir(os.getcwd()):
-            if not item.startswith('.'):
+    # Extract the archive before the target branch is touched, so that an
+    # unreadable archive leaves the branch as it was. The temporary directory
+    # is put in the git directory when possible, to move rather than copy.
+    git_dir = os.path.join(get_root() or os.getcwd(), '.git')
+    tmp_dir = tempfile.mkdtemp(dir=git_dir if os.path.isdir(git_dir) else None)
+    try:
+        extract_tarball(tarball_path, tmp_dir)
+        with inbranch(target_branch):
+            # Clear out the local branch
+            items = []
+            for item in os.listdir(os.getcwd()):
+                if item in ['.git', '..', '.']:
+                    continue
                 items.append(item)
-        tarball_prefix = os.path.basename(tarball_path)[:-len('.tag.gz')]
-        if [tarball_prefix] == items:
-            debug('Removing nested tarball folder: ' + str(tarball_prefix))
-            tarball_prefix_path = os.path.join(os.getcwd(), tarball_prefix)
-            for item in os.listdir(tarball_prefix_path):
-                if item in ['.', '..']:
+            if len(items) > 0:
+                execute_command(['git', 'rm', '-rf', '--'] + [i for i in items if i], shell=False)
+            # Clear out any untracked files
+            execute_command(['git', 'clean', '-fdx'], shell=False)
+
+            # Move the extracted archive into the clean branch
+            for item in os.listdir(tmp_dir):
+                shutil.move(os.path.join(tmp_dir, item), os.path.join(os.getcwd(), item))
+
+            # Commit changes to the repository
+            items = []
+            for item in os.listdir(os.getcwd()):
+                if item in ['.git', '..', '.']:
                     continue
-                item_path = os.path.join(os.getcwd(), tarball_prefix, item)
-                debug(
-                    'moving ' + str(item_path) + ' to ' +
-                    str(os.path.join(os.getcwd(), item))
-                )
-                shutil.move(item_path, os.path.join(os.getcwd(), item))
-            shutil.rmtree(tarball_prefix_path)
-        else:
-            debug('No nested tarball folder found.')
-
-        # Commit changes to the repository
-        items = []
-        for item in os.listdir(os.getcwd()):
-            if item in ['.git', '..', '.']:
-                continue
-            items.append(item)
-        if len(items) > 0:
-            execute_command('git add ' + ' '.join(['"%s"' % i for i in items if i]))
-        # Remove any straggling untracked files
-        execute_command('git clean -dXf')
-        # Only if we have local changes commit
-        # (not true if the upstream didn't change any files)
-        if has_changes():
-            msg = "Imported upstream version '{0}' of '{1}'"
-            msg = msg.format(version, name or 'upstream')
-            cmd = 'git commit -m "{0}"'.format(msg)
-            execute_command(cmd)
-    # with inbranch(target_branch):
+                items.append(item)
+            if len(items) > 0:
+                execute_command(['git', 'add', '--'] + [i for i in items if i], shell=False)
+            # Remove any straggling untracked files
+            execute_command(['git', 'clean', '-dXf'], shell=False)
+            # Only if we have local changes commit
+            # (not true if the upstream didn't change any files)
+            if has_changes():
+                msg = "Imported upstream version '{0}' of '{1}'"
+                msg = msg.format(version, name or 'upstream')
+                execute_command(['git', 'commit', '-m', msg], shell=False)
+        # with inbranch(target_branch):
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
 
 
 def handle_tree(tree, directory, root_path, version):
@@ -190,7 +213,7 @@ def handle_tree(tree, directory, root_path, version):
             if os.path.isfile(rel_path):
                 warning("  File '{0}' already exists, overwriting..."
                         .format(rel_path))
-                execute_command('git rm {0}'.format(rel_path), shell=True)
+                execute_command(['git', 'rm', rel_path], shell=False)
             # If package.xml tempalte in version, else grab data
             if path in ['stack.xml']:
                 warning("  Skipping '{0}' templating, fuerte not supported"
@@ -214,7 +237,7 @@ def handle_tree(tree, directory, root_path, version):
                     file_data = file_data.encode('utf-8')
                 f.write(file_data)
             # Add it with git
-            execute_command('git add {0}'.format(rel_path), shell=True)
+            execute_command(['git', 'add', rel_path], shell=False)
 
 
 def import_patches(patches_path, patches_path_dict, target_branch, version):
@@ -222,9 +245,8 @@ def import_patches(patches_path, patches_path_dict, target_branch, version):
          .format(patches_path, target_branch, BLOOM_CONFIG_BRANCH))
     with inbranch(target_branch):
         handle_tree(patches_path_dict, '', patches_path, version)
-        cmd = ('git commit --allow-empty -m "Overlaid patches from \'{0}\'"'
-               .format(patches_path))
-        execute_command(cmd, shell=True)
+        msg = "Overlaid patches from '{0}'".format(patches_path)
+        execute_command(['git', 'commit', '--allow-empty', '-m', msg], shell=False)
 
 
 def import_upstream(tarball_path, patches_path, version, name, replace):
@@ -292,23 +314,19 @@ def import_upstream(tarball_path, patches_path, version, name, replace):
 
     # Check for existing tags
     upstream_tag = 'upstream/{0}'.format(version)
-    if tag_exists(upstream_tag):
-        if not replace:
-            error("Tag '{0}' already exists, use --replace to override it."
-                  .format(upstream_tag), exit=True)
-        warning("Removing tag: '{0}'".format(upstream_tag))
-        delete_tag(upstream_tag)
-        if not get_git_clone_state():
-            delete_remote_tag(upstream_tag)
     name_tag = '{0}/{1}'.format(name or 'upstream', version)
-    if name_tag != upstream_tag and tag_exists(name_tag):
+    tags = [upstream_tag] if name_tag == upstream_tag else [upstream_tag, name_tag]
+    existing_tags = [tag for tag in tags if tag_exists(tag)]
+    for tag in existing_tags:
         if not replace:
             error("Tag '{0}' already exists, use --replace to override it."
-                  .format(name_tag), exit=True)
-        warning("Removing tag: '{0}'".format(name_tag))
-        delete_tag(name_tag)
+                  .format(tag), exit=True)
+        warning("Removing tag: '{0}'".format(tag))
+    # Remove all of the replaced tags at once, locally and then remotely
+    if existing_tags:
+        delete_tag(existing_tags)
         if not get_git_clone_state():
-            delete_remote_tag(name_tag)
+            delete_remote_tag(existing_tags)
 
     # If there is not upstream branch, create one
     if not branch_exists('upstream'):
@@ -371,15 +389,22 @@ allows replacement of an existing upstream import of the same version
     return parser
 
 
-def main(sysargs=None):
-    from bloom.config import upconvert_bloom_to_config_branch
-    upconvert_bloom_to_config_branch()
+# Parser used by main, including the global arguments, built only once
+_main_parser = None
+
 
-    parser = get_argument_parser()
-    parser = add_global_arguments(parser)
+def main(sysargs=None):
+    global _main_parser
+    if _main_parser is None:
+        _main_parser = add_global_arguments(get_argument_parser())
+    parser = _main_parser
+    # Parse the arguments first, so --help and usage errors need no git calls
     args = parser.parse_args(sysargs)
     handle_global_arguments(args)
 
+    from bloom.config import upconvert_bloom_to_config_branch
+    upconvert_bloom_to_config_branch()
+
     # Check that the current directory is a serviceable git/bloom repo
     try:
         ensure_clean_working_env()
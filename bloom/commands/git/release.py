@@ -35,7 +35,6 @@ from __future__ import print_function
 import argparse
 import atexit
 import os
-import shutil
 import subprocess
 import sys
 import tempfile
@@ -50,7 +49,6 @@ from bloom.config import write_tracks_dict_raw
 from bloom.git import ensure_clean_working_env
 from bloom.git import ensure_git_root
 from bloom.git import get_current_branch
-from bloom.git import get_root
 from bloom.git import GitClone
 
 from bloom.logging import debug
@@ -65,21 +63,14 @@ from bloom.packages import get_package_data
 
 import bloom.util
 from bloom.util import add_global_arguments
-from bloom.util import change_directory
 from bloom.util import code
 from bloom.util import disable_git_clone
 from bloom.util import handle_global_arguments
 from bloom.util import maybe_continue
 from bloom.util import quiet_git_clone_warning
+from bloom.util import remove_directory_in_background
 from bloom.util import safe_input
 
-try:
-    from vcstools.vcs_abstraction import get_vcs_client
-except ImportError:
-    debug(traceback.format_exc())
-    error("vcstools was not detected, please install it.", file=sys.stderr,
-          exit=True)
-
 upstream_repos = {}
 
 _error = get_error_prefix()
@@ -88,6 +79,12 @@ _error = get_error_prefix()
 def get_upstream_repo(uri, vcs_type):
     global upstream_repos
     if uri not in upstream_repos:
+        try:
+            from vcstools.vcs_abstraction import get_vcs_client
+        except ImportError:
+            debug(traceback.format_exc())
+            error("vcstools was not detected, please install it.", file=sys.stderr,
+                  exit=True)
         temp_dir = tempfile.mkdtemp()
         upstream_dir = os.path.join(temp_dir, 'upstream')
         upstream_repos[uri] = (temp_dir, get_vcs_client(vcs_type, upstream_dir))
@@ -100,7 +97,7 @@ def clean_up_repositories():
     for uri in upstream_repos:
         path = upstream_repos[uri][0]
         if os.path.exists(path):
-            shutil.rmtree(path)
+            remove_directory_in_background(path)
 
 
 # def find_version_from_upstream_github(vcs_uri, devel_branch=None):
@@ -110,14 +107,14 @@ def clean_up_repositories():
 
 
 def get_upstream_meta(upstream_dir, ros_distro):
-    meta = None
     directory = os.getcwd()
-    with change_directory(upstream_dir):
-        if get_root() is not None:  # If in a git repo
-            current_branch = get_current_branch()
-        else:
-            current_branch = None
-        name, version, packages = get_package_data(current_branch, quiet=False, release_directory=directory)
+    # Only ask git for the branch name if the checkout is a git repository
+    if os.path.exists(os.path.join(upstream_dir, '.git')):
+        current_branch = get_current_branch(directory=upstream_dir)
+    else:
+        current_branch = None
+    name, version, packages = get_package_data(current_branch, directory=upstream_dir, quiet=False,
+                                               release_directory=directory)
     meta = {
         'name': name,
         'version': version,
@@ -41,7 +41,6 @@ import difflib
 import os
 import pkg_resources
 import platform
-import shutil
 import subprocess
 import sys
 import tempfile
@@ -105,6 +104,7 @@ from bloom.util import handle_global_arguments
 from bloom.util import load_url_to_file_handle
 from bloom.util import maybe_continue
 from bloom.util import quiet_git_clone_warning
+from bloom.util import remove_directory_in_background
 from bloom.util import safe_input
 from bloom.util import temporary_directory
 from bloom.util import to_unicode
@@ -153,7 +153,7 @@ def exit_cleanup():
     for repo in _repositories.values():
         repo_path = repo.get_path()
         if os.path.exists(repo_path):
-            shutil.rmtree(repo_path)
+            remove_directory_in_background(repo_path)
 
 
 _rosdistro_distribution_file_urls = {}
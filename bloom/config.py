@@ -57,11 +57,16 @@ from bloom.logging import sanitize
 from bloom.util import execute_command
 from bloom.util import my_copytree
 
-from bloom.rosdistro_api import get_non_eol_distros_prompt
-
 BLOOM_CONFIG_BRANCH = 'master'
 PLACEHOLDER_FILE = 'CONTENT_MOVED_TO_{0}_BRANCH'.format(BLOOM_CONFIG_BRANCH.upper())
 
+
+def ros_distro_spec():
+    # Needs the rosdistro index, so it is only loaded when a prompt shows it
+    from bloom.rosdistro_api import get_non_eol_distros_prompt
+    return "This can be any valid ROS distro, e.g. %s" % get_non_eol_distros_prompt()
+
+
 config_spec = {
     'name': {
         '<name>': 'Name of the repository (used in the archive name)',
@@ -118,8 +123,7 @@ This is used only when version is set to ':{auto}'.
 ''',
     },
     'ros_distro': {
-        '<ROS distro>': "This can be any valid ROS distro, e.g. %s" %
-                        get_non_eol_distros_prompt()
+        '<ROS distro>': ros_distro_spec
     },
     'patches': {
         '<path in bloom branch>': '''\
@@ -168,6 +172,8 @@ class PromptEntry(object):
         if self.spec is not None:
             for key, val in self.spec.items():
                 msg += '\n  ' + key
+                if callable(val):
+                    val = val()
                 for line in val.splitlines():
                     msg += '\n    ' + line
         else:
@@ -323,7 +329,7 @@ def get_tracks_dict_raw(directory=None):
     validate_track_versions(tracks_dict)
     return tracks_dict
 
-_has_checked_bloom_branch = False
+_bloom_branch_checked_roots = set()
 
 
 def check_for_multiple_remotes():
@@ -341,27 +347,30 @@ def check_for_multiple_remotes():
 
 
 def upconvert_bloom_to_config_branch():
-    global _has_checked_bloom_branch
-    if _has_checked_bloom_branch:
+    git_root = get_root()
+    if git_root is None:
+        # Not a git repository
+        return
+    if git_root in _bloom_branch_checked_roots:
         return
     # Assert that this repository does not have multiple remotes
     check_for_multiple_remotes()
-    if get_root() is None:
-        # Not a git repository
-        return
     track_branches(['bloom', BLOOM_CONFIG_BRANCH])
+    if not branch_exists('bloom'):
+        # Nothing to convert, and nothing in bloom creates this branch anymore
+        _bloom_branch_checked_roots.add(git_root)
+        return
     if show('bloom', PLACEHOLDER_FILE) is not None:
+        # Already converted
+        _bloom_branch_checked_roots.add(git_root)
         return
     if show('bloom', 'bloom.conf') is not None:
         # Wait for the bloom.conf upconvert...
         return
-    if not branch_exists('bloom'):
-        return
-    _has_checked_bloom_branch = True
+    _bloom_branch_checked_roots.add(git_root)
     info("Moving configurations from deprecated 'bloom' branch "
          "to the '{0}' branch.".format(BLOOM_CONFIG_BRANCH))
     tmp_dir = mkdtemp()
-    git_root = get_root()
     try:
         # Copy the new upstream source into the temporary directory
         with inbranch('bloom'):
@@ -476,7 +476,8 @@ def generate_substitutions_from_package(
             if not os.path.exists(license_file):
                 error("License file '{}' is not found.".
                       format(license_file), exit=True)
-            license_text = open(license_file, 'r').read().rstrip()
+            with open(license_file, 'r') as f:
+                license_text = f.read().rstrip()
             licenses.append((str(l), format_multiline(license_text)))
         else:
             licenses.append((str(l), 'See repository for full license text'))
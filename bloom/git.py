@@ -34,15 +34,16 @@
 
 from __future__ import print_function
 
+import atexit
 import os
 import functools
 import re
-import shutil
 import subprocess
 import tempfile
 
 from subprocess import PIPE
 from subprocess import CalledProcessError
+from subprocess import Popen
 
 from bloom.logging import debug
 from bloom.logging import error
@@ -56,6 +57,7 @@ from bloom.util import execute_command
 from bloom.util import get_git_clone_state
 from bloom.util import get_git_clone_state_quiet
 from bloom.util import pdb_hook
+from bloom.util import remove_directory_in_background
 import bloom.util
 
 
@@ -78,9 +80,11 @@ class GitClone(object):
         self.current_branches = get_branches()
         self.tmp_dir = tempfile.mkdtemp()
         self.clone_dir = os.path.join(self.tmp_dir, 'clone')
-        self.repo_url = 'file://' + os.path.abspath(self.directory)
+        # A plain path (rather than a file:// url) lets git hardlink the
+        # object database instead of packing and copying every object
+        self.repo_url = os.path.abspath(self.directory)
         info(fmt("@!@{gf}+++@| Cloning working copy for safety"))
-        execute_command('git clone ' + self.repo_url + ' ' + self.clone_dir)
+        execute_command('git clone "{0}" "{1}"'.format(self.repo_url, self.clone_dir))
 
     def __del__(self):
         if self.disabled:
@@ -109,7 +113,8 @@ class GitClone(object):
         if self.disabled:
             return
         if self.tmp_dir is not None and os.path.exists(self.tmp_dir):
-            shutil.rmtree(self.tmp_dir)
+            close_git_sessions()
+            remove_directory_in_background(self.tmp_dir)
             self.tmp_dir = None
 
     def commit(self):
@@ -130,10 +135,13 @@ class GitClone(object):
                         with inbranch(branch):
                             cmd = 'git pull --rebase origin ' + branch
                             execute_command(cmd)
-                execute_command('git push --all', silent=False)
+                # Push branches and tags in a single invocation
+                cmd = "git push origin 'refs/heads/*:refs/heads/*' 'refs/tags/*:refs/tags/*'"
                 try:
-                    execute_command('git push --tags', silent=False)
+                    execute_command(cmd, silent=False)
                 except subprocess.CalledProcessError:
+                    # Retry the branches alone so that their failures still propagate
+                    execute_command('git push --all', silent=False)
                     warning("Force pushing tags from clone to working repository, "
                             "you will have to force push back to origin...")
                     execute_command('git push --force --tags', silent=False)
@@ -141,6 +149,91 @@ class GitClone(object):
         self.clean_up()
 
 
+class GitSession(object):
+    """
+    A long running ``git cat-file --batch-check`` process for a repository.
+
+    References are resolved by writing them to the process and reading back
+    the answer, rather than starting a new git process for every query.
+    Use get_git_session to get the session for a given directory.
+    """
+    cmd = ['git', 'cat-file', '--batch-check']
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.devnull = open(os.devnull, 'w')
+        self.process = Popen(self.cmd, cwd=directory, stdin=PIPE, stdout=PIPE,
+                             stderr=self.devnull)
+
+    def rev_parse(self, reference):
+        """
+        Returns the SHA-1 of the object for the given reference.
+
+        :param reference: any git reference, e.g. 'refs/heads/master'
+        :returns: SHA-1 of the referenced object, None if it does not exist
+
+        :raises: subprocess.CalledProcessError if the git process has exited
+        """
+        try:
+            self.process.stdin.write((reference + '\n').encode('utf-8'))
+            self.process.stdin.flush()
+            line = self.process.stdout.readline()
+        except (IOError, OSError):
+            line = ''
+        if not line:
+            self.close()
+            raise CalledProcessError(self.process.returncode, self.cmd)
+        if not isinstance(line, str):
+            line = line.decode('utf-8')
+        tokens = line.split()
+        if tokens[-1] in ['missing', 'ambiguous']:
+            return None
+        return tokens[0]
+
+    def ref_exists(self, reference):
+        """Returns True if the given reference exists, False otherwise"""
+        return self.rev_parse(reference) is not None
+
+    def close(self):
+        _git_sessions.pop(self.directory, None)
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+            except (IOError, OSError):
+                pass
+            self.process.wait()
+        self.devnull.close()
+
+
+_git_sessions = {}
+
+
+def get_git_session(directory=None):
+    """
+    Returns the GitSession for the repository containing the given directory.
+
+    The session is started on first use and reused afterwards.
+
+    :param directory: directory in the repository, if None the cwd is used
+    :returns: GitSession for the repository
+
+    :raises: subprocess.CalledProcessError if directory is not in a git repository
+    """
+    root = get_root(directory)
+    if root is None:
+        raise CalledProcessError(128, GitSession.cmd)
+    if root not in _git_sessions:
+        _git_sessions[root] = GitSession(root)
+    return _git_sessions[root]
+
+
+@atexit.register
+def close_git_sessions():
+    """Stops the processes of all open GitSession's."""
+    for session in list(_git_sessions.values()):
+        session.close()
+
+
 def ls_tree(reference, path=None, directory=None):
     """
     Returns a dictionary of files and folders for a given reference and path.
@@ -425,7 +518,7 @@ def tag_exists(tag, directory=None):
 
     :raises: subprocess.CalledProcessError if any git calls fail
     """
-    return tag in get_tags(directory)
+    return get_git_session(directory).ref_exists('refs/tags/' + tag)
 
 
 def create_tag(tag, directory=None):
@@ -442,27 +535,33 @@ def create_tag(tag, directory=None):
 
 def delete_tag(tag, directory=None):
     """
-    Deletes a given local tag.
+    Deletes a given local tag, or a list of local tags.
 
-    :param tag: local tag to delete
+    :param tag: local tag (or list of local tags) to delete
     :param directory: directory in which to preform this action
 
     :raises: subprocess.CalledProcessError if any git calls fail
     """
-    execute_command('git tag -d {0}'.format(tag), shell=True, cwd=directory)
+    tags = list(tag) if isinstance(tag, (list, tuple)) else [tag]
+    execute_command('git tag -d {0}'.format(' '.join(tags)), shell=True,
+                    cwd=directory)
 
 
 def delete_remote_tag(tag, remote='origin', directory=None):
     """
-    Deletes a given remote tag.
+    Deletes a given remote tag, or a list of remote tags.
 
-    :param tag: remote tag to delete
+    All of the tags are deleted with a single push to the remote.
+
+    :param tag: remote tag (or list of remote tags) to delete
     :param remote: git remote to delete tag from (defaults to 'origin')
     :param directory: directory in which to preform this action
 
     :raises: subprocess.CalledProcessError if any git calls fail
     """
-    execute_command('git push {0} :{1}'.format(remote, tag), shell=True,
+    tags = list(tag) if isinstance(tag, (list, tuple)) else [tag]
+    refspecs = ' '.join([':' + t for t in tags])
+    execute_command('git push {0} {1}'.format(remote, refspecs), shell=True,
                     cwd=directory)
 
 
@@ -491,6 +590,11 @@ def branch_exists(branch_name, local_only=False, directory=None):
 
     :raises: subprocess.CalledProcessError if any git calls fail
     """
+    # Check for the local branch directly rather than listing all branches
+    if get_git_session(directory).ref_exists('refs/heads/' + branch_name):
+        return True
+    if local_only:
+        return False
     for branch in get_branches(local_only, directory):
         if branch.startswith('remotes/'):
             branch = branch.split('/')
@@ -498,9 +602,6 @@ def branch_exists(branch_name, local_only=False, directory=None):
                 branch = '/'.join(branch[2:])
                 if branch_name == branch:
                     return True
-        else:
-            if branch_name == branch:
-                return True
     return False
 
 
@@ -580,21 +681,53 @@ def ensure_git_root():
               exit=True)
 
 
+# Results of get_root, keyed by the absolute path of the queried directory
+_root_cache = {}
+# Results of get_current_branch, keyed by the git root and the HEAD contents
+_current_branch_cache = {}
+
+
+def _read_head(root):
+    """
+    Returns the contents of the HEAD file of the repository at the given root.
+
+    None is returned if the HEAD file cannot be read directly, e.g. because
+    .git is a file pointing elsewhere (worktrees and submodules).
+    """
+    try:
+        with open(os.path.join(root, '.git', 'HEAD'), 'r') as f:
+            return f.read()
+    except (IOError, OSError):
+        return None
+
+
 def get_root(directory=None):
     """
     Returns the git root directory above the given dir.
 
     If the given dir is not in a git repository, None is returned.
 
+    Roots which are found are remembered for the rest of the process, since
+    a directory does not move between repositories.
+
     :param directory: directory to query from, if None the cwd is used
     :returns: root of git repository or None if not a git repository
     """
+    try:
+        key = os.path.abspath(directory or os.getcwd())
+    except OSError:
+        key = None
+    if key in _root_cache:
+        return _root_cache[key]
     cmd = 'git rev-parse --show-toplevel'
     try:
         output = check_output(cmd, shell=True, cwd=directory, stderr=PIPE)
     except CalledProcessError:
         return None
-    return output.strip()
+    root = output.strip()
+    if key is not None:
+        _root_cache[key] = root
+    return root
 
 
 def get_current_branch(directory=None):
@@ -605,11 +738,19 @@ def get_current_branch(directory=None):
     a git repository.  If no branch could be determined it will return None,
     i.e. (no branch) will return None.
 
+    Branches which are found are remembered for as long as the repository's
+    HEAD file is unchanged, so that repeated queries do not call git again.
+    Reading HEAD also catches changes made by other processes.
+
     :param directory: directory in which to run the command
     :returns: current git branch or None if none can be determined, (no branch)
 
     :raises: subprocess.CalledProcessError if git command fails
     """
+    root = get_root(directory)
+    key = (root, _read_head(root)) if root is not None else None
+    if key is not None and key[1] is not None and key in _current_branch_cache:
+        return _current_branch_cache[key]
     cmd = 'git branch --no-color'
     output = check_output(cmd, shell=True, cwd=directory)
     output = output.splitlines()
@@ -618,6 +759,8 @@ def get_current_branch(directory=None):
             token = token[2:]
             if token == '(no branch)':
                 return None
+            if key is not None and key[1] is not None:
+                _current_branch_cache[key] = token
             return token
     return None
 
@@ -630,65 +773,71 @@ def track_branches(branches=None, directory=None):
     tracked.  If this is set to None then all remote branches will be tracked.
     :param directory: directory in which to run all commands
 
-    :raises: subprocess.CalledProcessError if git command fails
+    Branches which cannot be tracked are skipped with a warning.
+
+    :raises: subprocess.CalledProcessError if listing the branches fails
     """
     if type(branches) == str:
         branches = [branches]
     debug("track_branches(" + str(branches) + ", " + str(directory) + ")")
     if branches == []:
         return
-    # Save the current branch
-    current_branch = get_current_branch(directory)
-    try:
-        # Get the local branches
-        local_branches = get_branches(local_only=True, directory=directory)
-        # Get the remote and local branches
-        all_branches = get_branches(local_only=False, directory=directory)
-        # Calculate the untracked branches
-        untracked_branches = []
-        for branch in all_branches:
-            if branch.startswith('remotes/'):
-                if branch.count('/') >= 2:
-                    branch = '/'.join(branch.split('/')[2:])
-            if branch not in local_branches:
-                untracked_branches.append(branch)
-        # Prune any untracked branches by specified branches
-        if branches is not None:
-            branches_to_track = []
-            for untracked in untracked_branches:
-                if untracked in branches:
-                    branches_to_track.append(untracked)
-        else:
-            branches_to_track = untracked_branches
-        # Track branches
-        debug("Tracking branches: " + str(branches_to_track))
-        for branch in branches_to_track:
-            checkout(branch, directory=directory)
-    finally:
-        if current_branch:
-            checkout(current_branch, directory=directory)
+    # Get the local and remote branches with a single listing
+    all_branches = get_branches(local_only=False, directory=directory)
+    local_branches = [b for b in all_branches if not b.startswith('remotes/')]
+    # Calculate the untracked branches and the remote branch for each
+    untracked_branches = {}
+    for branch in all_branches:
+        if not branch.startswith('remotes/') or branch.count('/') < 2:
+            continue
+        remote_branch = '/'.join(branch.split('/')[1:])
+        branch = '/'.join(branch.split('/')[2:])
+        if branch not in local_branches and branch not in untracked_branches:
+            untracked_branches[branch] = remote_branch
+    # Prune any untracked branches by specified branches
+    if branches is not None:
+        branches_to_track = [b for b in untracked_branches if b in branches]
+    else:
+        branches_to_track = list(untracked_branches)
+    # Track branches, without checking each of them out
+    debug("Tracking branches: " + str(branches_to_track))
+    for branch in branches_to_track:
+        cmd = 'git branch --track "{0}" "{1}"'.format(branch, untracked_branches[branch])
+        # A branch which cannot be created, e.g. 'foo/bar' next to a local
+        # 'foo', should not prevent the others from being tracked
+        ret, out, _ = execute_command(cmd, autofail=False, silent_error=True, cwd=directory, return_io=True)
+        if ret != 0:
+            warning("Failed to track branch '{0}': {1}".format(branch, (out or '').strip()))
 
 
 def get_last_tag_by_version(directory=None):
     """
-    Returns the most recent, by date, tag in the given local git repository.
+    Returns the most recent, by version, upstream tag in the given local git
+    repository.
+
+    Only tags of the form upstream/X.Y.Z are considered, each tag's version
+    is parsed once into a tuple of integers.
 
     :param directory: the directory in which to run the query
-    :returns: the most recent tag by date, else '' if there are no tags
+    :returns: the most recent tag by version, else '' if there are no tags
 
     :raises: subprocess.CalledProcessError if git command fails
     """
     cmd = "git for-each-ref --sort='*authordate' " \
           "--format='%(refname:short)' refs/tags/upstream"
     output = check_output(cmd, shell=True, cwd=directory, stderr=PIPE)
-    tags = []
-    versions = []
+    last_tag = ''
+    last_version = None
     for line in output.splitlines():
-        tags.append(line.strip())
-        ver = re.match(r"[0-9]+\.[0-9]+\.[0-9]+", line)
-        if ver:
-            versions.append(ver)
-    return tags[versions.index(max(versions))] if versions else ''
+        tag = line.strip()
+        match = re.match(r"([0-9]+)\.([0-9]+)\.([0-9]+)$", tag.split('/')[-1])
+        if match is None:
+            continue
+        version = tuple(int(x) for x in match.groups())
+        if last_version is None or version >= last_version:
+            last_tag = tag
+            last_version = version
+    return last_tag
 
 
 def get_last_tag_by_date(directory=None):
@@ -36,6 +36,7 @@ from __future__ import unicode_literals
 
 import os
 import sys
+import threading
 import traceback
 
 from packaging.version import parse as parse_version
@@ -45,6 +46,12 @@ try:
     from urllib.parse import urlparse
 except ImportError:
     from urlparse import urlparse
+try:
+    from queue import Empty
+    from queue import Queue
+except ImportError:
+    from Queue import Empty
+    from Queue import Queue
 
 from bloom.github import Github
 from bloom.github import GithubException
@@ -69,6 +76,10 @@ except ImportError:
 
 _rosdistro_index = None
 _rosdistro_distribution_files = {}
+# Errors of the downloads done by fetch_distribution_files, keyed by distro
+_rosdistro_distribution_file_errors = {}
+# Number of distribution files fetch_distribution_files downloads at a time
+_max_fetch_threads = 4
 _rosdistro_index_commit = None
 _rosdistro_index_original_branch = None
 
@@ -150,11 +161,12 @@ def get_most_recent(thing_name, repository, reference_distro):
         'source': lambda r: None if r.source_repository is None else r.source_repository,
     }
     get_thing = get_things[thing_name]
-    for distro in list_distributions():
-        # skip distros with a different type if the information is available
-        if reference_distro_type is not None:
-            if get_distribution_type(distro) != reference_distro_type:
-                continue
+    distros = list_distributions()
+    # skip distros with a different type if the information is available
+    if reference_distro_type is not None:
+        distros = [d for d in distros if get_distribution_type(d) == reference_distro_type]
+    fetch_distribution_files(distros)
+    for distro in distros:
         distro_file = get_distribution_file(distro)
         if repository in distro_file.repositories:
             thing = get_thing(distro_file.repositories[repository])
@@ -168,6 +180,8 @@ def get_most_recent(thing_name, repository, reference_distro):
 
 def get_distribution_file(distro):
     global _rosdistro_distribution_files
+    if distro in _rosdistro_distribution_file_errors:
+        error(_rosdistro_distribution_file_errors[distro], exit=True)
     if distro not in _rosdistro_distribution_files:
         # REP 143, get list of distribution files and take the last one
         files = rosdistro.get_distribution_files(get_index(), distro)
@@ -178,6 +192,51 @@ def get_distribution_file(distro):
     return _rosdistro_distribution_files[distro]
 
 
+def fetch_distribution_files(distros):
+    """Downloads the distribution files of the given distros concurrently
+
+    The downloads are independent of each other, so a few worker threads
+    share them and store the results in the cache used by
+    get_distribution_file. Failures are recorded rather than raised, so
+    get_distribution_file reports them without downloading again.
+    """
+    # Load the index up front so the threads do not each fetch it
+    index = get_index()
+    missing = [d for d in distros
+               if d not in _rosdistro_distribution_files and d not in _rosdistro_distribution_file_errors]
+    if len(missing) < 2:
+        return
+    pending = Queue()
+    for distro in missing:
+        pending.put(distro)
+
+    def fetch():
+        while True:
+            try:
+                distro = pending.get_nowait()
+            except Empty:
+                return
+            try:
+                files = rosdistro.get_distribution_files(index, distro)
+            except Exception as exc:
+                debug(traceback.format_exc())
+                _rosdistro_distribution_file_errors[distro] = \
+                    "Failed to fetch the distribution file for '{0}': {1}".format(distro, exc)
+                continue
+            if not files:
+                _rosdistro_distribution_file_errors[distro] = \
+                    "No distribution files listed for distribution '{0}'.".format(distro)
+                continue
+            _rosdistro_distribution_files[distro] = files[-1]
+
+    threads = [threading.Thread(target=fetch) for _ in range(min(_max_fetch_threads, len(missing)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
 def get_rosdistro_index_commit():
     return _rosdistro_index_commit
 
@@ -357,8 +357,10 @@ def __get_env_for_cmd(cmd):
 def check_output(cmd, cwd=None, stdin=None, stderr=None, shell=False):
     """Backwards compatible check_output"""
     env = __get_env_for_cmd(cmd)
+    # File descriptors are not inherited by default (PEP 446) and Python 2
+    # never closed them, so skip closing every possible descriptor per call
     p = Popen(cmd, cwd=cwd, stdin=stdin, stderr=stderr, shell=shell,
-              stdout=PIPE, env=env)
+              stdout=PIPE, env=env, close_fds=False)
     out, err = p.communicate()
     if p.returncode:
         raise CalledProcessError(p.returncode, cmd)
@@ -367,6 +369,26 @@ def check_output(cmd, cwd=None, stdin=None, stderr=None, shell=False):
     return out
 
 
+def remove_directory_in_background(path):
+    """Removes a directory tree without waiting for the removal to finish
+
+    Where ``rm`` is available the removal is handed off to a child process,
+    so large temporary clones do not hold up the command, otherwise the tree
+    is removed in place, ignoring errors.
+    """
+    if sys.platform != 'win32':
+        try:
+            # Detach from bloom's stdio, so that anything reading bloom's
+            # output does not wait for the removal to finish
+            with open(os.devnull, 'r+') as devnull:
+                Popen(['rm', '-rf', path], stdin=devnull, stdout=devnull,
+                      stderr=devnull, close_fds=True)
+            return
+        except (IOError, OSError):
+            debug("Failed to remove '{0}' in the background".format(path))
+    shutil.rmtree(path, ignore_errors=True)
+
+
 def create_temporary_directory(prefix_dir=None):
     """Creates a temporary directory and returns its location"""
     from tempfile import mkdtemp
@@ -433,7 +455,9 @@ def execute_command(cmd, shell=True, autofail=True, silent=True,
         err_io = STDOUT
     debug(((cwd) if cwd else os.getcwd()) + ":$ " + str(cmd))
     env = __get_env_for_cmd(cmd)
-    p = Popen(cmd, shell=shell, cwd=cwd, stdout=out_io, stderr=err_io, env=env)
+    # See check_output for why close_fds is disabled
+    p = Popen(cmd, shell=shell, cwd=cwd, stdout=out_io, stderr=err_io, env=env,
+              close_fds=False)
     out, err = p.communicate()
     if out is not None and not isinstance(out, str):
         out = out.decode('utf-8')
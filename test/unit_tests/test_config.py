@@ -1,8 +1,11 @@
 import os
 
 from ..utils.common import AssertRaisesContext
+from ..utils.common import in_temporary_directory
 from ..utils.common import redirected_stdio
+from ..utils.common import user
 
+from bloom.commands.git.config import parse_bloom_conf
 from bloom.config import validate_track_versions
 
 test_data_dir = os.path.join(os.path.dirname(__file__), 'test_packages_data')
@@ -21,3 +24,25 @@ def test_validate_track_versions():
             validate_track_versions(tracks_dict)
     tracks_dict['tracks']['foo']['version'] = '1.2.7'
     validate_track_versions(tracks_dict)
+
+
+@in_temporary_directory
+def test_parse_bloom_conf():
+    user('git config -f bloom.conf bloom.upstream https://github.com/ros/foo.git')
+    user('git config -f bloom.conf bloom.upstreamtype git')
+    with open('bloom.conf', 'r') as f:
+        data = f.read()
+    # git indents the keys with a tab, which Python 2's readfp rejects as is
+    assert '\tupstream = ' in data
+    assert parse_bloom_conf(data) == ('https://github.com/ros/foo.git', 'git', '')
+    user('git config -f bloom.conf bloom.upstreambranch "groovy-devel"')
+    with open('bloom.conf', 'r') as f:
+        data = f.read()
+    assert parse_bloom_conf(data) == ('https://github.com/ros/foo.git', 'git', 'groovy-devel')
+    assert parse_bloom_conf(data.replace('[bloom]', '[Bloom]')) == \
+        ('https://github.com/ros/foo.git', 'git', 'groovy-devel')
+    # git config takes the last of repeated keys
+    user('git config -f bloom.conf --add bloom.upstreamtype hg')
+    with open('bloom.conf', 'r') as f:
+        data = f.read()
+    assert parse_bloom_conf(data) == ('https://github.com/ros/foo.git', 'hg', 'groovy-devel')
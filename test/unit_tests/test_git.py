@@ -0,0 +1,115 @@
+import os
+
+from ..utils.common import in_temporary_directory
+from ..utils.common import redirected_stdio
+from ..utils.common import user
+
+from bloom.git import branch_exists
+from bloom.git import delete_remote_tag
+from bloom.git import delete_tag
+from bloom.git import get_current_branch
+from bloom.git import get_last_tag_by_version
+from bloom.git import tag_exists
+from bloom.git import track_branches
+
+
+@in_temporary_directory
+def test_get_current_branch_follows_external_checkouts():
+    user('git init .')
+    user('git checkout -b foo')
+    user('git commit --allow-empty -m "Initial commit"')
+    assert get_current_branch() == 'foo'
+    user('git checkout -b bar')
+    assert get_current_branch() == 'bar'
+    user('git checkout foo')
+    assert get_current_branch() == 'foo'
+
+
+@in_temporary_directory
+def test_ref_queries_see_external_changes():
+    user('git init .')
+    user('git commit --allow-empty -m "Initial commit"')
+    assert not tag_exists('upstream/0.1.0')
+    assert not branch_exists('upstream', local_only=True)
+    user('git tag upstream/0.1.0')
+    user('git branch upstream')
+    assert tag_exists('upstream/0.1.0')
+    assert branch_exists('upstream', local_only=True)
+    user('git tag -d upstream/0.1.0')
+    user('git pack-refs --all')
+    assert not tag_exists('upstream/0.1.0')
+    assert branch_exists('upstream', local_only=True)
+
+
+@in_temporary_directory
+def test_get_last_tag_by_version():
+    user('git init .')
+    user('git commit --allow-empty -m "Initial commit"')
+    assert get_last_tag_by_version() == ''
+    user('git tag upstream/0.10.0')
+    user('git tag upstream/0.9.1')
+    user('git tag upstream/not-a-version')
+    user('git tag upstream/1.0.0@baz')
+    assert get_last_tag_by_version() == 'upstream/0.10.0'
+
+
+def _create_clone_with_remote_branches(directory, remote_branches):
+    user('mkdir upstream')
+    user('git init .', directory=os.path.join(directory, 'upstream'))
+    user('git checkout -b main', directory=os.path.join(directory, 'upstream'))
+    user('git commit --allow-empty -m "Initial commit"', directory=os.path.join(directory, 'upstream'))
+    for branch in remote_branches:
+        user('git branch ' + branch, directory=os.path.join(directory, 'upstream'))
+    user('git clone upstream clone')
+    user('cd clone')
+
+
+def _local_branches():
+    return user('git for-each-ref --format="%(refname:short)" refs/heads',
+                return_io=True)[1].split()
+
+
+@in_temporary_directory
+def test_track_branches_specific(directory=None):
+    _create_clone_with_remote_branches(directory, ['foo', 'bar'])
+    track_branches(['foo'])
+    assert sorted(_local_branches()) == ['foo', 'main']
+    track_branches('bar')
+    assert sorted(_local_branches()) == ['bar', 'foo', 'main']
+    assert user('git rev-parse --abbrev-ref foo@{upstream}', return_io=True)[1].strip() == 'origin/foo'
+
+
+@in_temporary_directory
+def test_track_branches_all_leaves_head_untouched(directory=None):
+    _create_clone_with_remote_branches(directory, ['foo', 'bar'])
+    head = user('git rev-parse HEAD', return_io=True)[1]
+    track_branches()
+    assert sorted(_local_branches()) == ['bar', 'foo', 'main']
+    assert get_current_branch() == 'main'
+    assert user('git rev-parse HEAD', return_io=True)[1] == head
+    assert user('git status --porcelain', return_io=True)[1] == ''
+
+
+@in_temporary_directory
+def test_track_branches_skips_branches_which_cannot_be_created(directory=None):
+    _create_clone_with_remote_branches(directory, ['foo/bar', 'baz'])
+    user('git branch foo')
+    with redirected_stdio():
+        track_branches()
+    assert sorted(_local_branches()) == ['baz', 'foo', 'main']
+    assert get_current_branch() == 'main'
+
+
+@in_temporary_directory
+def test_delete_tags(directory=None):
+    _create_clone_with_remote_branches(directory, [])
+    upstream_dir = os.path.join(directory, 'upstream')
+    for tag in ['a', 'upstream/0.1.0', 'foo/0.1.0', 'upstream/0.2.0']:
+        user('git tag ' + tag, directory=upstream_dir)
+    user('git fetch --tags')
+    delete_tag(u'upstream/0.2.0')
+    delete_remote_tag(u'upstream/0.2.0')
+    delete_tag(['upstream/0.1.0', 'foo/0.1.0'])
+    delete_remote_tag(('upstream/0.1.0', 'foo/0.1.0'))
+    assert user('git tag', return_io=True)[1].split() == ['a']
+    assert user('git tag', directory=upstream_dir, return_io=True)[1].split() == ['a']
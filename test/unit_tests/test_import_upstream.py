@@ -0,0 +1,82 @@
+import os
+import tarfile
+
+from ..utils.common import AssertRaisesContext
+from ..utils.common import in_temporary_directory
+from ..utils.common import redirected_stdio
+from ..utils.common import user
+
+from bloom.commands.git.import_upstream import get_argument_parser
+from bloom.commands.git.import_upstream import import_tarball
+from bloom.commands.git.import_upstream import version_check
+from bloom.git import show
+from bloom.util import add_global_arguments
+
+
+def _create_tarball(tarball_path):
+    with open('bar.txt', 'w') as f:
+        f.write('bar')
+    with tarfile.open(tarball_path, 'w:gz') as tar:
+        tar.add('bar.txt', arcname='foo-0.1.0/bar.txt')
+    os.remove('bar.txt')
+
+
+def _create_release_repo():
+    user('mkdir release')
+    user('cd release')
+    user('git init .')
+    user('git commit --allow-empty -m "Initial commit"')
+    user('git checkout -b upstream')
+    user('echo foo > foo.txt')
+    user('git add foo.txt')
+    user('git commit -m "Add foo"')
+    user('git checkout -')
+
+
+@in_temporary_directory
+def test_import_tarball(directory=None):
+    tarball_path = os.path.join(directory, 'foo-0.1.0.tar.gz')
+    _create_tarball(tarball_path)
+    _create_release_repo()
+    import_tarball(tarball_path, 'upstream', '0.1.0', 'foo')
+    assert show('upstream', 'bar.txt') == 'bar'
+    assert show('upstream', 'foo.txt') is None
+
+
+@in_temporary_directory
+def test_import_truncated_tarball_leaves_branch_untouched(directory=None):
+    tarball_path = os.path.join(directory, 'foo-0.1.0.tar.gz')
+    _create_tarball(tarball_path)
+    with open(tarball_path, 'rb') as f:
+        data = f.read()
+    with open(tarball_path, 'wb') as f:
+        f.write(data[:len(data) // 2])
+    _create_release_repo()
+    head = user('git rev-parse upstream', return_io=True)[1]
+    with AssertRaisesContext(SystemExit):
+        import_tarball(tarball_path, 'upstream', '0.1.0', 'foo')
+    assert user('git rev-parse upstream', return_io=True)[1] == head
+    assert show('upstream', 'foo.txt') == 'foo'
+    assert user('git status --porcelain', return_io=True)[1] == ''
+    assert not [d for d in os.listdir('.git') if d.startswith('tmp')]
+
+
+def test_get_argument_parser_returns_a_bare_parser():
+    # Callers add the global arguments themselves, which must not conflict
+    for _ in range(2):
+        parser = add_global_arguments(get_argument_parser())
+        args = parser.parse_args(['foo-0.1.0.tar.gz', '--replace', '-d'])
+        assert args.replace and args.debug
+
+
+@in_temporary_directory
+def test_version_check_non_pep440_version():
+    user('git init .')
+    user('git commit --allow-empty -m "Initial commit"')
+    user('git tag upstream/0.1.0')
+    with redirected_stdio() as (out, err):
+        version_check('1.0.0~beta')
+    assert "Cannot compare the upstream version '1.0.0~beta'" in out.getvalue() + err.getvalue()
+    with redirected_stdio() as (out, err):
+        version_check('0.0.1')
+    assert "isn't newer than" in out.getvalue() + err.getvalue()